@@ -0,0 +1,163 @@
+from functools import lru_cache
+from pathlib import Path
+import json
+import os
+import re
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+MOCKED_DIR = ROOT_DIR / "files" / "mocked_city_files"
+SNAPSHOT_FILE = ROOT_DIR / ".cache" / "mocked_city_corpus.json"
+SNAPSHOT_VERSION = 1
+TEMPERATURE_LINE_PREFIX = "the current temperature in "
+TEMPERATURE_RE = re.compile(r"The current temperature in .*? is\s+(-?\d+(?:\.\d+)?)\s+degrees Celsius\.")
+
+
+def parse_summary(text: str) -> str:
+    # Keep everything except the trailing temperature line.
+    lines = [ln.rstrip() for ln in text.splitlines()]
+    while lines and not lines[-1].strip():
+        lines.pop()
+    if lines and lines[-1].lower().startswith(TEMPERATURE_LINE_PREFIX):
+        lines = lines[:-1]
+    return "\n".join(lines).strip()
+
+
+def parse_temperature(text: str) -> float | None:
+    m = TEMPERATURE_RE.search(text)
+    if not m:
+        return None
+    return float(m.group(1))
+
+
+class CityEntry:
+    __slots__ = ("path", "mtime_ns", "size", "_summary", "_temperature", "parsed")
+
+    def __init__(self, path: Path, mtime_ns: int, size: int):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self._summary = ""
+        self._temperature: float | None = None
+        self.parsed = False
+
+    @property
+    def city(self) -> str:
+        return self.path.stem.strip()
+
+    @property
+    def summary(self) -> str:
+        self.parse()
+        return self._summary
+
+    @property
+    def temperature(self) -> float | None:
+        self.parse()
+        return self._temperature
+
+    def parse(self):
+        if self.parsed:
+            return
+        text = self.path.read_text(encoding="utf-8")
+        self._summary = parse_summary(text)
+        self._temperature = parse_temperature(text)
+        self.parsed = True
+
+    def to_json(self) -> dict:
+        return {
+            "mtime_ns": self.mtime_ns,
+            "size": self.size,
+            "summary": self._summary,
+            "temperature": self._temperature,
+        }
+
+    def load_parsed(self, data: dict):
+        self._summary = data["summary"]
+        self._temperature = data["temperature"]
+        self.parsed = True
+
+
+class CityCorpus:
+    # Scans the mocked city directory once per process. Parsed results are kept in a JSON
+    # snapshot, so later runs and every xdist worker only stat the files and re-parse the
+    # ones whose mtime or size changed.
+
+    def __init__(self, root: str | Path = MOCKED_DIR, snapshot_path: str | Path | None = SNAPSHOT_FILE):
+        self.root = Path(root)
+        self.snapshot_path = Path(snapshot_path) if snapshot_path else None
+        self._entries: list[CityEntry] | None = None
+        self._snapshot_stale = False
+
+    def load_snapshot(self) -> dict[str, dict]:
+        if self.snapshot_path is None:
+            return {}
+        try:
+            data = json.loads(self.snapshot_path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return {}
+        if data.get("version") != SNAPSHOT_VERSION or data.get("root") != str(self.root):
+            return {}
+        return data.get("entries", {})
+
+    def save_snapshot(self):
+        if self.snapshot_path is None or not self._snapshot_stale or self._entries is None:
+            return
+        data = {
+            "version": SNAPSHOT_VERSION,
+            "root": str(self.root),
+            "entries": {e.path.name: e.to_json() for e in self._entries if e.parsed},
+        }
+        self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.snapshot_path.with_name(f"{self.snapshot_path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        # Atomic, so concurrent xdist workers never read a half-written snapshot.
+        os.replace(tmp, self.snapshot_path)
+        self._snapshot_stale = False
+
+    def scan(self) -> list[CityEntry]:
+        snapshot = self.load_snapshot()
+        entries = []
+        with os.scandir(self.root) as it:
+            for d in it:
+                if not d.name.endswith(".txt") or not d.is_file():
+                    continue
+                st = d.stat()
+                entry = CityEntry(Path(d.path), st.st_mtime_ns, st.st_size)
+                cached = snapshot.pop(d.name, None)
+                if cached and cached["mtime_ns"] == st.st_mtime_ns and cached["size"] == st.st_size:
+                    entry.load_parsed(cached)
+                else:
+                    self._snapshot_stale = True
+                entries.append(entry)
+        # Files left in the snapshot were deleted since it was written.
+        self._snapshot_stale = self._snapshot_stale or bool(snapshot)
+        entries.sort(key=lambda e: e.path.name)
+        return entries
+
+    def entries(self) -> list[CityEntry]:
+        if self._entries is None:
+            self._entries = self.scan()
+        return self._entries
+
+    def refresh(self):
+        self._entries = None
+
+    def cities(self) -> list[str]:
+        return [e.city for e in self.entries()]
+
+    def parsed_entries(self) -> list[CityEntry]:
+        entries = self.entries()
+        for e in entries:
+            e.parse()
+        self.save_snapshot()
+        return entries
+
+    def cases(self) -> list[tuple[str, str]]:
+        return [(e.city, e.summary) for e in self.parsed_entries()]
+
+    def cases_with_temperature(self) -> list[tuple[str, str, float | None]]:
+        return [(e.city, e.summary, e.temperature) for e in self.parsed_entries()]
+
+
+@lru_cache(maxsize=None)
+def mocked_city_corpus() -> CityCorpus:
+    return CityCorpus()
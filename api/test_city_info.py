@@ -4,42 +4,19 @@ import json
 import requests
 
 import api.city_info as city_info
+from api.city_corpus import mocked_city_corpus
 import pytest
 
 
-MOCKED_DIR = Path(__file__).resolve().parents[1] / "files" / "mocked_city_files"
 REPO_FILES_DIR = Path(__file__).resolve().parents[1] / "files"
 
 
-def discover_mocked_city_files() -> list[Path]:
-    return sorted(p for p in MOCKED_DIR.glob("*.txt") if p.is_file())
-
-
-def city_from_mock_file(path: Path) -> str:
-    return path.stem.strip()
-
-
-def summary_from_mock_file(text: str) -> str:
-    # Keep everything except the trailing temperature line.
-    lines = [ln.rstrip() for ln in text.splitlines()]
-    while lines and not lines[-1].strip():
-        lines.pop()
-    if lines and lines[-1].lower().startswith("the current temperature in "):
-        lines = lines[:-1]
-    return "\n".join(lines).strip()
-
-
 def mocked_city_cases() -> list[tuple[str, str]]:
-    cases: list[tuple[str, str]] = []
-    for p in discover_mocked_city_files():
-        city = city_from_mock_file(p)
-        summary = summary_from_mock_file(p.read_text(encoding="utf-8"))
-        cases.append((city, summary))
-    return cases
+    return mocked_city_corpus().cases()
 
 
 def mocked_city_case_ids() -> list[str]:
-    return [city for city, _summary in mocked_city_cases()]
+    return mocked_city_corpus().cities()
 
 
 @pytest.mark.parametrize("script_name", ["city_info.py"])
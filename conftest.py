@@ -1,10 +1,14 @@
+from pathlib import Path
 import logging
 import pytest
 
-pytest_plugins = ["pytest_playwright"]
+from e2e_tests.download_cache import DownloadCache
+
+pytest_plugins = ["pytest_playwright", "pytester", "plugins.perf", "plugins.xdist_sharding", "plugins.netprof"]
 
 DEFAULT_TIMEOUT_MS = 10000
 DEFAULT_VIEWPORT = {"width": 1920, "height": 1080}  # type: ignore
+DOWNLOAD_CACHE_DIR = Path(__file__).resolve().parent / ".cache" / "downloads"
 
 # Hide loggers during tests
 def pytest_configure(config):
@@ -25,3 +29,7 @@ def page(context):
     page.set_default_timeout(DEFAULT_TIMEOUT_MS)
     yield page
     page.close()
+
+@pytest.fixture(scope="session")
+def download_cache():
+    return DownloadCache(DOWNLOAD_CACHE_DIR)
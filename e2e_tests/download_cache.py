@@ -0,0 +1,170 @@
+from contextlib import contextmanager
+from pathlib import Path
+import hashlib
+import json
+import os
+import shutil
+import time
+import requests
+
+from e2e_tests import http_download
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+INDEX_FILE = "index.json"
+LOCK_FILE = "index.lock"
+
+
+# Content-addressed cache keyed by URL: blobs live under blobs/<sha256>, index.json maps every
+# URL to its blob plus the ETag / Last-Modified validators used for the conditional GET.
+# Several xdist workers may share one cache, so temp files are per process, and the index and
+# blobs/ are only changed under an exclusive file lock.
+class DownloadCache:
+
+    def __init__(self, root: str | Path, *, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = Path(root)
+        self.blobs = self.root / "blobs"
+        self.incoming = self.root / "incoming"
+        self.max_bytes = max_bytes
+
+    def blob_path(self, sha256: str) -> Path:
+        return self.blobs / sha256
+
+    def incoming_path(self, url: str) -> Path:
+        return self.incoming / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.{os.getpid()}"
+
+    @contextmanager
+    def index_lock(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.root / LOCK_FILE, "a+") as f:
+            # Imported here so that importing the cache (root conftest) works on every platform.
+            if os.name == "nt":
+                import msvcrt
+
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                unlock = lambda: msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+
+                fcntl.flock(f, fcntl.LOCK_EX)
+                unlock = lambda: fcntl.flock(f, fcntl.LOCK_UN)
+            try:
+                yield
+            finally:
+                unlock()
+
+    def load_index(self) -> dict[str, dict]:
+        p = self.root / INDEX_FILE
+        try:
+            return json.loads(p.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def save_index(self, index: dict[str, dict]):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.root / f"{INDEX_FILE}.{os.getpid()}.tmp"
+        tmp.write_text(json.dumps(index, indent=2), encoding="utf-8")
+        os.replace(tmp, self.root / INDEX_FILE)
+
+    def valid_entry(self, entry: dict | None) -> bool:
+        if not entry:
+            return False
+        blob = self.blob_path(entry["sha256"])
+        # A hardlinked copy edited in place would corrupt the blob, so never trust it blindly.
+        return blob.is_file() and http_download.hash_file(blob).hexdigest() == entry["sha256"]
+
+    def lookup(self, url: str) -> dict | None:
+        entry = self.load_index().get(url)
+        return entry if self.valid_entry(entry) else None
+
+    def conditional_get(self, url: str, entry: dict | None, timeout_s: float) -> requests.Response:
+        headers = dict(http_download.IDENTITY_ENCODING)
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return requests.get(url, stream=True, timeout=timeout_s, headers=headers)
+
+    def hit(self, url: str, entry: dict, out_path: Path) -> http_download.DownloadResult:
+        with self.index_lock():
+            index = self.load_index()
+            if url in index:
+                index[url]["last_used"] = time.time()
+                self.save_index(index)
+            # Under the lock, so a concurrent record() cannot evict the blob halfway through.
+            self.materialize(self.blob_path(entry["sha256"]), out_path)
+        return http_download.DownloadResult(out_path, url, entry["size"], entry["sha256"], from_cache=True)
+
+    def record(self, url: str, incoming: Path, sha256: str, size: int, etag: str | None, last_modified: str | None):
+        with self.index_lock():
+            # Replacing (rather than keeping an existing blob) also repairs a blob that failed validation.
+            os.replace(incoming, self.blob_path(sha256))
+            index = self.load_index()
+            index[url] = {
+                "sha256": sha256,
+                "size": size,
+                "etag": etag,
+                "last_modified": last_modified,
+                "last_used": time.time(),
+            }
+            self.evict(index)
+            self.save_index(index)
+            self.remove_orphans(index)
+
+    def revalidate(
+        self, url: str, out_path: str | Path, *, timeout_s: float = http_download.DEFAULT_TIMEOUT_S
+    ) -> tuple[http_download.DownloadResult | None, dict]:
+        # Materializes the cached copy on 304. Otherwise returns no result, plus the validators
+        # of the current version so the caller can put() the file it downloads itself.
+        entry = self.lookup(url)
+        try:
+            with self.conditional_get(url, entry, timeout_s) as resp:
+                if entry and resp.status_code == 304:
+                    return self.hit(url, entry, Path(out_path)), {}
+                if resp.status_code != 200:
+                    return None, {}
+                # The body is never read; closing the streamed response drops it.
+                return None, {"etag": resp.headers.get("ETag"), "last_modified": resp.headers.get("Last-Modified")}
+        except requests.RequestException:
+            return None, {}
+
+    def put(
+        self, url: str, path: str | Path, *, etag: str | None = None, last_modified: str | None = None
+    ) -> http_download.DownloadResult:
+        path = Path(path)
+        self.incoming.mkdir(parents=True, exist_ok=True)
+        self.blobs.mkdir(parents=True, exist_ok=True)
+        target = self.incoming_path(url)
+        shutil.copyfile(path, target)
+        sha256 = http_download.hash_file(target).hexdigest()
+        size = target.stat().st_size
+        self.record(url, target, sha256, size, etag, last_modified)
+        return http_download.DownloadResult(path, url, size, sha256)
+
+    def evict(self, index: dict[str, dict]):
+        # Least recently used first, until the unique blobs fit in max_bytes. Caller holds the lock.
+        def total() -> int:
+            return sum({e["sha256"]: e["size"] for e in index.values()}.values())
+
+        for url, _entry in sorted(index.items(), key=lambda item: item[1].get("last_used", 0)):
+            if total() <= self.max_bytes or len(index) == 1:
+                break
+            index.pop(url)
+
+    def remove_orphans(self, index: dict[str, dict]):
+        # Evicted entries and older versions of a URL leave blobs nothing points to. Caller holds the lock.
+        referenced = {e["sha256"] for e in index.values()}
+        for blob in self.blobs.iterdir():
+            if blob.name not in referenced:
+                blob.unlink(missing_ok=True)
+
+    def materialize(self, blob: Path, out_path: Path):
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = out_path.with_name(f"{out_path.name}.{os.getpid()}.tmp")
+        tmp.unlink(missing_ok=True)
+        try:
+            os.link(blob, tmp)
+        except OSError:
+            # Different filesystem or no hardlink support.
+            shutil.copyfile(blob, tmp)
+        os.replace(tmp, out_path)
@@ -0,0 +1,300 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+import hashlib
+import json
+import os
+import re
+import requests
+
+CHUNK_SIZE = 256 * 1024
+DEFAULT_TIMEOUT_S: float = 10.0
+DEFAULT_RETRIES = 3
+# Files smaller than this are always fetched with a single stream, even if segments > 1.
+PARALLEL_THRESHOLD = 32 * 1024 * 1024
+# Content-Length must describe the bytes we write, so ask for an unencoded body.
+IDENTITY_ENCODING = {"Accept-Encoding": "identity"}
+
+
+@dataclass
+class DownloadResult:
+    path: Path
+    url: str
+    size: int
+    sha256: str
+    resumed: bool = False
+    segments: int = 1
+    from_cache: bool = False
+
+
+def part_path(out_path: Path) -> Path:
+    return out_path.with_name(f"{out_path.name}.part")
+
+
+def validator_path(tmp: Path) -> Path:
+    return tmp.with_name(f"{tmp.name}.json")
+
+
+def response_validator(resp: requests.Response) -> str | None:
+    # If-Range needs a strong validator; weak ETags fall back to Last-Modified.
+    etag = resp.headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return resp.headers.get("Last-Modified")
+
+
+def load_validator(tmp: Path) -> str | None:
+    try:
+        return json.loads(validator_path(tmp).read_text(encoding="utf-8")).get("validator")
+    except (FileNotFoundError, ValueError, AttributeError):
+        return None
+
+
+def save_validator(tmp: Path, validator: str | None):
+    # Sidecar next to the part file, so a resume in a later run can still send If-Range.
+    if validator:
+        validator_path(tmp).write_text(json.dumps({"validator": validator}), encoding="utf-8")
+    else:
+        validator_path(tmp).unlink(missing_ok=True)
+
+
+def discard_part(tmp: Path):
+    tmp.unlink(missing_ok=True)
+    validator_path(tmp).unlink(missing_ok=True)
+
+
+def hash_file(path: Path, hasher=None, chunk_size: int = CHUNK_SIZE):
+    hasher = hasher or hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            hasher.update(chunk)
+    return hasher
+
+
+def total_from_content_range(value: str | None) -> int | None:
+    # "bytes 100-199/1234" or "bytes */1234"
+    m = re.match(r"bytes\s+(?:\d+-\d+|\*)/(\d+)", value or "")
+    return int(m.group(1)) if m else None
+
+
+def expected_total(resp: requests.Response, offset: int) -> int | None:
+    if resp.status_code == 206:
+        return total_from_content_range(resp.headers.get("Content-Range"))
+    length = resp.headers.get("Content-Length")
+    return offset + int(length) if length and length.isdigit() else None
+
+
+def probe_size(session: requests.Session, url: str, timeout_s: float) -> tuple[int | None, bool, str | None]:
+    try:
+        resp = session.head(url, timeout=timeout_s, allow_redirects=True, headers=IDENTITY_ENCODING)
+    except requests.RequestException:
+        return None, False, None
+    if resp.status_code != 200:
+        return None, False, None
+    length = resp.headers.get("Content-Length")
+    size = int(length) if length and length.isdigit() else None
+    return size, resp.headers.get("Accept-Ranges", "").lower() == "bytes", response_validator(resp)
+
+
+def range_start(resp: requests.Response) -> int | None:
+    m = re.match(r"bytes\s+(\d+)-", resp.headers.get("Content-Range") or "")
+    return int(m.group(1)) if m else None
+
+
+def should_retry(error: requests.RequestException) -> bool:
+    # Client errors will not go away on retry; network errors and 5xx might.
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code >= 500
+    return True
+
+
+def write_response(resp: requests.Response, tmp: Path, mode: str, hasher, offset: int = 0, *, chunk_size: int = CHUNK_SIZE):
+    total = expected_total(resp, offset)
+    with open(tmp, mode) as f:
+        for chunk in resp.iter_content(chunk_size):
+            f.write(chunk)
+            hasher.update(chunk)
+    size = tmp.stat().st_size
+    if total is not None and size != total:
+        raise requests.ConnectionError(f"Incomplete download: {size} of {total} bytes")
+    return hasher
+
+
+def stream_single(
+    session: requests.Session,
+    url: str,
+    tmp: Path,
+    *,
+    timeout_s: float,
+    chunk_size: int,
+    retries: int,
+):
+    attempt = 0
+    resumed = False
+    validator = load_validator(tmp) if tmp.exists() else None
+    while True:
+        offset = tmp.stat().st_size if tmp.exists() else 0
+        if offset and not validator:
+            # Without a validator we cannot tell whether the bytes on disk belong to the current file.
+            discard_part(tmp)
+            offset = 0
+        headers = dict(IDENTITY_ENCODING)
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+            # Server answers 200 with the full body if the file changed since the part was written.
+            headers["If-Range"] = validator
+        try:
+            with session.get(url, stream=True, timeout=timeout_s, headers=headers) as resp:
+                if offset and resp.status_code == 416:
+                    if total_from_content_range(resp.headers.get("Content-Range")) == offset:
+                        return hash_file(tmp), True
+                    discard_part(tmp)
+                    continue
+                resp.raise_for_status()
+                if offset and resp.status_code == 206 and range_start(resp) != offset:
+                    discard_part(tmp)
+                    continue
+                if offset and resp.status_code == 206:
+                    # Seed the hash with the bytes already on disk, then keep appending.
+                    hasher, mode, resumed = hash_file(tmp), "ab", True
+                else:
+                    hasher, mode, offset = hashlib.sha256(), "wb", 0
+                    validator = response_validator(resp)
+                    save_validator(tmp, validator)
+                write_response(resp, tmp, mode, hasher, offset, chunk_size=chunk_size)
+            return hasher, resumed
+        except requests.RequestException as e:
+            attempt += 1
+            if attempt > retries or not should_retry(e):
+                raise
+
+
+def fetch_segment(
+    url: str,
+    tmp: Path,
+    start: int,
+    end: int,
+    *,
+    timeout_s: float,
+    chunk_size: int,
+    retries: int,
+    validator: str | None = None,
+):
+    pos = start
+    attempt = 0
+    # requests.Session is not thread-safe, so every segment gets its own.
+    with requests.Session() as session:
+        while pos <= end:
+            headers = {**IDENTITY_ENCODING, "Range": f"bytes={pos}-{end}"}
+            if validator:
+                # A changed file turns into a 200, which fails the segment instead of mixing versions.
+                headers["If-Range"] = validator
+            try:
+                with session.get(url, stream=True, timeout=timeout_s, headers=headers) as resp:
+                    if resp.status_code != 206:
+                        raise RuntimeError(
+                            f"Server ignored range request for bytes {pos}-{end} (HTTP {resp.status_code})"
+                        )
+                    with open(tmp, "r+b") as f:
+                        f.seek(pos)
+                        for chunk in resp.iter_content(chunk_size):
+                            chunk = chunk[: end + 1 - pos]
+                            f.write(chunk)
+                            pos += len(chunk)
+                            if pos > end:
+                                break
+                if pos <= end:
+                    raise requests.ConnectionError(f"Segment {start}-{end} ended early at byte {pos}")
+            except requests.RequestException as e:
+                attempt += 1
+                if attempt > retries or not should_retry(e):
+                    raise
+
+
+def stream_segments(
+    url: str,
+    tmp: Path,
+    size: int,
+    segments: int,
+    *,
+    timeout_s: float,
+    chunk_size: int,
+    retries: int,
+    validator: str | None = None,
+):
+    step = -(-size // segments)
+    ranges = [(start, min(start + step, size) - 1) for start in range(0, size, step)]
+    discard_part(tmp)
+    with open(tmp, "wb") as f:
+        f.truncate(size)
+    try:
+        with ThreadPoolExecutor(max_workers=len(ranges)) as pool:
+            futures = [
+                pool.submit(
+                    fetch_segment,
+                    url,
+                    tmp,
+                    start,
+                    end,
+                    timeout_s=timeout_s,
+                    chunk_size=chunk_size,
+                    retries=retries,
+                    validator=validator,
+                )
+                for start, end in ranges
+            ]
+            for future in futures:
+                future.result()
+    except Exception:
+        # A sparse, partly-filled file must never be picked up by a later single-stream resume.
+        discard_part(tmp)
+        raise
+    return len(ranges)
+
+
+def download(
+    url: str,
+    out_path: str | Path,
+    *,
+    timeout_s: float = DEFAULT_TIMEOUT_S,
+    chunk_size: int = CHUNK_SIZE,
+    retries: int = DEFAULT_RETRIES,
+    segments: int = 1,
+    parallel_threshold: int = PARALLEL_THRESHOLD,
+    expected_sha256: str | None = None,
+) -> DownloadResult:
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = part_path(out_path)
+    resumed = False
+    used_segments = 1
+
+    with requests.Session() as session:
+        size, accepts_ranges, validator = probe_size(session, url, timeout_s) if segments > 1 else (None, False, None)
+        if accepts_ranges and size is not None and size >= parallel_threshold:
+            used_segments = stream_segments(
+                url,
+                tmp,
+                size,
+                segments,
+                timeout_s=timeout_s,
+                chunk_size=chunk_size,
+                retries=retries,
+                validator=validator,
+            )
+            # Segments arrive out of order, so hash the assembled file in one sequential pass.
+            hasher = hash_file(tmp, chunk_size=chunk_size)
+        else:
+            hasher, resumed = stream_single(
+                session, url, tmp, timeout_s=timeout_s, chunk_size=chunk_size, retries=retries
+            )
+
+    digest = hasher.hexdigest()
+    if expected_sha256 and digest != expected_sha256.strip().lower():
+        discard_part(tmp)
+        raise RuntimeError(f"SHA-256 mismatch for '{url}': expected {expected_sha256}, got {digest}")
+
+    size = tmp.stat().st_size
+    os.replace(tmp, out_path)
+    validator_path(tmp).unlink(missing_ok=True)
+    return DownloadResult(out_path, url, size, digest, resumed=resumed, segments=used_segments)
@@ -2,7 +2,9 @@ from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 from pathlib import Path
 from urllib.parse import urlparse
 import logging
-import requests
+
+from e2e_tests import http_download
+from e2e_tests.download_cache import DownloadCache
 
 
 class ReversingLabsPage:
@@ -30,13 +32,33 @@ class ReversingLabsPage:
 
 
     # functions
-    def __init__(self, page):
+    def __init__(self, page, perf=None):
         self.page = page
+        # Optional plugins.perf.PerfProbe; navigation metrics are only collected when set (--perf).
+        self.perf = perf
+        if perf is not None:
+            # Before the first goto, so the initial load's requests are counted too.
+            perf.watch(page)
+        # Result of the last download_* call, so tests can assert on hash / cache usage.
+        self.last_download: http_download.DownloadResult | None = None
         self.logger = logging.getLogger(self.__class__.__name__)
 
     def go_to_website(self, url: str):
+        if self.perf is not None:
+            self.perf.discard(self.page)
         self.page.goto(url)
         self.log_page_opened(url)
+        self.capture_perf(url)
+
+    def wait_for_url(self, url_pattern: str):
+        self.page.wait_for_url(url_pattern)
+        self.capture_perf(self.page.url)
+
+    def capture_perf(self, label: str):
+        if self.perf is None:
+            return None
+        self.page.wait_for_load_state("load")
+        return self.perf.capture(self.page, label)
 
     def click_by_selector_and_text(self, selector: str, text: str):
         loc = self.page.locator(selector, has_text=text).first
@@ -107,9 +129,21 @@ class ReversingLabsPage:
         download.save_as(str(out_path))
         self.log_saved(out_name, out_path)
 
+        self.last_download = http_download.DownloadResult(
+            out_path, download.url, out_path.stat().st_size, http_download.hash_file(out_path).hexdigest()
+        )
         return out_path, download.url
 
-    def download_via_http(self, href: str, out_dir: Path, filename: str, timeout_ms: int) -> tuple[Path, str]:
+    def download_via_http(
+        self,
+        href: str,
+        out_dir: Path,
+        filename: str,
+        timeout_ms: int,
+        *,
+        segments: int = 1,
+        expected_sha256: str | None = None,
+    ) -> tuple[Path, str]:
         out_name = self.resolve_filename(filename, href=href)
         out_path = out_dir / out_name
 
@@ -117,13 +151,47 @@ class ReversingLabsPage:
         self.log_download_started_http(out_name)
 
         timeout_s = max(5, int(timeout_ms / 1000))
-        r = requests.get(href, timeout=timeout_s)
-        r.raise_for_status()
-        out_path.write_bytes(r.content)
+        result = http_download.download(
+            href,
+            out_path,
+            timeout_s=timeout_s,
+            segments=segments,
+            expected_sha256=expected_sha256,
+        )
+        self.log_download_verified(out_name, result)
 
+        self.last_download = result
         self.log_saved(out_name, out_path)
         return out_path, href
 
+    def download_from_cache(
+        self,
+        href: str,
+        out_dir: Path,
+        filename: str,
+        timeout_ms: int,
+        cache: DownloadCache,
+    ) -> tuple[tuple[Path, str] | None, dict]:
+        out_name = self.resolve_filename(filename, href=href)
+        out_path = out_dir / out_name
+
+        timeout_s = max(5, int(timeout_ms / 1000))
+        result, validators = cache.revalidate(href, out_path, timeout_s=timeout_s)
+        if result is None:
+            return None, validators
+
+        self.log_download_cached(out_name, True)
+        self.last_download = result
+        self.log_saved(out_name, out_path)
+        return (out_path, href), validators
+
+    def store_in_cache(self, href: str, saved: tuple[Path, str], cache: DownloadCache, validators: dict):
+        out_path, download_url = saved
+        result = cache.put(href, out_path, **validators)
+        result.url = download_url
+        self.log_download_cached(out_path.name, False)
+        self.last_download = result
+
     def download_file_by_selector_and_text(
         self,
         selector: str,
@@ -132,6 +200,7 @@ class ReversingLabsPage:
         *,
         timeout_ms: int = 5000,
         filename: str | None = None,
+        cache: DownloadCache | None = None,
     ) -> tuple[Path, str]:
 
         out_dir = self.ensure_dir(download_dir)
@@ -142,11 +211,18 @@ class ReversingLabsPage:
         self.log_clicked(text)
 
         href = self.href_from_locator(loc)
+        validators: dict = {}
+        if cache is not None and href:
+            # Only a 304 skips the browser; on a miss the real download below fills the cache.
+            cached, validators = self.download_from_cache(href, out_dir, filename, timeout_ms, cache)
+            if cached is not None:
+                return cached
+
         ctx = self.page.context
         before_pages = list(ctx.pages)
 
         try:
-            return self.download_via_playwright(
+            saved = self.download_via_playwright(
                 loc,
                 timeout_ms=timeout_ms,
                 out_dir=out_dir,
@@ -156,7 +232,11 @@ class ReversingLabsPage:
         except PlaywrightTimeoutError:
             if not href:
                 raise
-            return self.download_via_http(href=href, out_dir=out_dir, filename=filename, timeout_ms=timeout_ms)
+            saved = self.download_via_http(href=href, out_dir=out_dir, filename=filename, timeout_ms=timeout_ms)
+
+        if cache is not None and href:
+            self.store_in_cache(href, saved, cache, validators)
+        return saved
 
     def remove_file_if_exists(self, file_path: str | Path) -> bool:
         p = Path(file_path)
@@ -205,6 +285,18 @@ class ReversingLabsPage:
     def log_download_started_http(self, name: str):
         self.logger.debug('Download started via HTTP: "%s"', name)
 
+    def log_download_verified(self, name: str, result: http_download.DownloadResult):
+        self.logger.debug(
+            '"%s" downloaded: %d bytes, sha256=%s, resumed=%s, segments=%d',
+            name, result.size, result.sha256, result.resumed, result.segments,
+        )
+
+    def log_download_cached(self, name: str, from_cache: bool):
+        if from_cache:
+            self.logger.debug('"%s" not modified, served from download cache', name)
+        else:
+            self.logger.debug('"%s" downloaded and stored in download cache', name)
+
     def log_saved(self, name: str, path: Path):
         self.logger.debug('"%s" successfully saved in: "%s"', name, path)
 
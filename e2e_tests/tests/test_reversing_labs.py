@@ -1,9 +1,10 @@
+from e2e_tests import http_download
 from e2e_tests.pages.reversing_labs_page import ReversingLabsPage
 from pathlib import Path
 from urllib.parse import urlparse
 
-def test_reversing_labs(page):
-    rl = ReversingLabsPage(page)
+def test_reversing_labs(page, perf, download_cache):
+    rl = ReversingLabsPage(page, perf)
 
     rl.go_to_website(ReversingLabsPage.HOME_URL)
 
@@ -15,7 +16,7 @@ def test_reversing_labs(page):
     assert rl.is_visible_by_selector_and_text(ReversingLabsPage.spectraAnalyzeLink, ReversingLabsPage.spectraAnalyzeText)
     rl.click_by_selector_and_text(ReversingLabsPage.spectraAnalyzeLink, ReversingLabsPage.spectraAnalyzeText)
 
-    page.wait_for_url(f"**{ReversingLabsPage.spectraAnalyze}**")
+    rl.wait_for_url(f"**{ReversingLabsPage.spectraAnalyze}**")
     assert ReversingLabsPage.spectraAnalyze in page.url
 
     spectra_analyze_title = "Advanced Malware Analysis & Threat Hunting | ReversingLabs"
@@ -29,7 +30,7 @@ def test_reversing_labs(page):
     assert rl.is_visible_by_selector_and_text(ReversingLabsPage.spectraDetectLink, ReversingLabsPage.spectraDetectText)
     rl.click_by_selector_and_text(ReversingLabsPage.spectraDetectLink, ReversingLabsPage.spectraDetectText)
 
-    page.wait_for_url(f"**{ReversingLabsPage.spectraDetect}**")
+    rl.wait_for_url(f"**{ReversingLabsPage.spectraDetect}**")
     assert ReversingLabsPage.spectraDetect in page.url
 
     assert page.title() != spectra_analyze_title
@@ -56,6 +57,7 @@ def test_reversing_labs(page):
         ReversingLabsPage.downloadDatasheetText,
         downloads_dir,
         filename=expected_filename,
+        cache=download_cache,
     )
 
     # Validate the download came from the same URL as the link on the page
@@ -66,3 +68,11 @@ def test_reversing_labs(page):
     assert saved_path.name == expected_filename
     assert saved_path.suffix.lower() == ".pdf"
     assert saved_path.stat().st_size > 10_000  # downloaded file isn't empty
+
+    # Validate the saved file matches the cached blob (stored on a miss, served via 304 on repeat runs)
+    assert rl.last_download is not None
+    assert rl.last_download.path == saved_path
+    assert rl.last_download.sha256 == http_download.hash_file(saved_path).hexdigest()
+    cached_blob = download_cache.blob_path(rl.last_download.sha256)
+    assert http_download.hash_file(cached_blob).hexdigest() == rl.last_download.sha256
+    assert download_cache.load_index()[expected_pdf_url]["sha256"] == rl.last_download.sha256
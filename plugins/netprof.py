@@ -0,0 +1,226 @@
+from pathlib import Path
+from time import perf_counter
+from urllib.parse import urlparse
+import json
+import logging
+import threading
+
+import pytest
+import requests
+
+from plugins.perf import request_bytes
+
+DEFAULT_NETPROF_JSON = Path("reports") / "network-profile.json"
+DEFAULT_TOP = 10
+
+logger = logging.getLogger("netprof")
+
+
+class NetworkCall:
+    __slots__ = ("source", "host", "bytes", "latency_s")
+
+    def __init__(self, source: str, url: str, nbytes: int = 0, latency_s: float = 0.0):
+        self.source = source
+        self.host = urlparse(url).hostname or url
+        self.bytes = nbytes
+        self.latency_s = latency_s
+
+
+def summarize(calls: list[NetworkCall]) -> list[dict]:
+    # One row per (source, host); latency is summed, so parallel calls can exceed wall time.
+    rows: dict[tuple[str, str], dict] = {}
+    for call in calls:
+        row = rows.setdefault(
+            (call.source, call.host),
+            {"source": call.source, "host": call.host, "count": 0, "bytes": 0, "latency_s": 0.0, "max_latency_s": 0.0},
+        )
+        row["count"] += 1
+        row["bytes"] += call.bytes
+        row["latency_s"] += call.latency_s
+        row["max_latency_s"] = max(row["max_latency_s"], call.latency_s)
+    return sorted(rows.values(), key=lambda r: -r["latency_s"])
+
+
+def total_latency(rows: list[dict]) -> float:
+    return sum(r["latency_s"] for r in rows)
+
+
+class NetworkProfiler:
+
+    def __init__(self):
+        # Not thread-local on purpose: download segments run in worker threads of the same test.
+        self.current: str | None = None
+        self.calls: dict[str, list[NetworkCall]] = {}
+        # Playwright requests of the current test; sizes are read once, after the test (see collect_playwright).
+        self.pending: list[tuple[object, bool]] = []
+        self._original_send = None
+        self._local = threading.local()
+
+    def record(self, call: NetworkCall) -> NetworkCall:
+        if self.current is not None:
+            self.calls.setdefault(self.current, []).append(call)
+        return call
+
+    def pop(self, nodeid: str) -> list[NetworkCall]:
+        return self.calls.pop(nodeid, [])
+
+    def patch_requests(self):
+        # Every requests.get()/Session.get() ends up in Session.send.
+        original = self._original_send = requests.Session.send
+        profiler = self
+
+        def send(session, request, **kwargs):
+            # resolve_redirects calls send again for every hop; only the outermost call is recorded.
+            # Its latency covers all hops and it returns the final response.
+            if getattr(profiler._local, "in_send", False):
+                return original(session, request, **kwargs)
+            start = perf_counter()
+            profiler._local.in_send = True
+            try:
+                resp = original(session, request, **kwargs)
+            finally:
+                profiler._local.in_send = False
+            call = profiler.record(NetworkCall("requests", request.url, latency_s=perf_counter() - start))
+            if not kwargs.get("stream"):
+                call.bytes = len(resp.content or b"")
+                return resp
+            # Streamed bodies are read later; keep the call's bytes and latency up to date as they arrive.
+            iter_content = resp.iter_content
+
+            def counting_iter_content(*args, **kw):
+                for chunk in iter_content(*args, **kw):
+                    call.bytes += len(chunk)
+                    call.latency_s = perf_counter() - start
+                    yield chunk
+
+            resp.iter_content = counting_iter_content
+            return resp
+
+        requests.Session.send = send
+
+    def unpatch_requests(self):
+        if self._original_send is not None:
+            requests.Session.send = self._original_send
+            self._original_send = None
+
+    def watch_context(self, context):
+        context.on("requestfinished", self.on_request_finished)
+        context.on("requestfailed", self.on_request_failed)
+
+    def on_request_finished(self, req):
+        self.pending.append((req, True))
+
+    def on_request_failed(self, req):
+        self.pending.append((req, False))
+
+    def collect_playwright(self):
+        # Runs before the browser context is closed, while sizes() can still reach the driver.
+        pending, self.pending = self.pending, []
+        for req, finished in pending:
+            if not finished:
+                self.record(NetworkCall("playwright", req.url))
+                continue
+            latency_ms = req.timing.get("responseEnd", -1)
+            self.record(NetworkCall("playwright", req.url, request_bytes(req), max(latency_ms, 0) / 1000))
+
+
+class NetworkReport:
+    # Lives in the process that receives reports (the controller under xdist).
+
+    def __init__(self, json_path: Path | None, top: int):
+        self.json_path = json_path
+        self.top = top
+        self.tests: dict[str, list[dict]] = {}
+
+    def pytest_runtest_logreport(self, report):
+        rows = getattr(report, "network_calls", None)
+        if rows:
+            self.tests[report.nodeid] = rows
+
+    def slowest(self) -> list[tuple[str, list[dict]]]:
+        return sorted(self.tests.items(), key=lambda item: -total_latency(item[1]))[: self.top]
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if not self.tests:
+            return
+        terminalreporter.write_sep("=", f"slowest {self.top} tests by network time")
+        terminalreporter.write_line(f"{'network s':>10} {'calls':>6} {'bytes':>12}  test / top host")
+        for nodeid, rows in self.slowest():
+            calls = sum(r["count"] for r in rows)
+            nbytes = sum(r["bytes"] for r in rows)
+            terminalreporter.write_line(
+                f"{total_latency(rows):10.2f} {calls:6d} {nbytes:12d}  {nodeid} ({rows[0]['source']}: {rows[0]['host']})"
+            )
+
+    def pytest_sessionfinish(self):
+        if not self.json_path or not self.tests:
+            return
+        self.json_path.parent.mkdir(parents=True, exist_ok=True)
+        data = {nodeid: {"network_s": total_latency(rows), "hosts": rows} for nodeid, rows in self.tests.items()}
+        self.json_path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("netprof", "network call profiling")
+    group.addoption("--netprof", action="store_true", default=False, help="Profile requests and Playwright network calls per test.")
+    group.addoption("--netprof-json", default=str(DEFAULT_NETPROF_JSON), help="JSON file the per-test network profile is written to.")
+    group.addoption("--netprof-top", type=int, default=DEFAULT_TOP, help="Number of tests in the slowest-by-network table.")
+
+
+def pytest_configure(config):
+    if not config.getoption("--netprof"):
+        return
+    config._netprof = NetworkProfiler()
+    config._netprof.patch_requests()
+    if not hasattr(config, "workerinput"):
+        config.pluginmanager.register(
+            NetworkReport(Path(config.getoption("--netprof-json")), config.getoption("--netprof-top")),
+            "netprof_report",
+        )
+
+
+def pytest_unconfigure(config):
+    profiler = getattr(config, "_netprof", None)
+    if profiler is not None:
+        profiler.unpatch_requests()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    profiler = getattr(item.config, "_netprof", None)
+    if profiler is not None:
+        profiler.current = item.nodeid
+    yield
+    if profiler is not None:
+        profiler.current = None
+
+
+@pytest.fixture(autouse=True)
+def netprof_playwright(request):
+    profiler = getattr(request.config, "_netprof", None)
+    # Only hook into Playwright for tests that already use a browser context.
+    if profiler is not None and "context" in request.fixturenames:
+        profiler.watch_context(request.getfixturevalue("context"))
+    yield
+    if profiler is not None:
+        profiler.collect_playwright()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    profiler = getattr(item.config, "_netprof", None)
+    if profiler is None or report.when != "teardown":
+        return
+    rows = summarize(profiler.pop(item.nodeid))
+    if not rows:
+        return
+    # Plain data, so it survives xdist report serialization to the controller.
+    report.network_calls = rows
+    logger.debug("Network calls for %s: %s", item.nodeid, rows)
+    pytest_html = item.config.pluginmanager.getplugin("html")
+    if pytest_html is not None:
+        extras = getattr(report, "extras", [])
+        extras.append(pytest_html.extras.json(rows, name="Network calls"))
+        report.extras = extras
@@ -0,0 +1,206 @@
+from datetime import datetime, timezone
+from fnmatch import fnmatch
+from pathlib import Path
+import json
+import logging
+
+import pytest
+
+DEFAULT_BUDGETS_FILE = Path(__file__).resolve().parents[1] / "e2e_tests" / "perf_budgets.json"
+DEFAULT_PERF_JSON = Path("reports") / "perf-metrics.jsonl"
+
+# Timings are collected in the page itself, so it works for every browser (CDP is Chromium
+# only). LCP entries are only delivered to a PerformanceObserver, hence the buffered observer
+# and the short wait before resolving. After client-side routing the navigation entry still
+# describes the first document, so document timings are only reported for a real load.
+PERF_METRICS_JS = """
+() => new Promise((resolve) => {
+  let lcp = null;
+  try {
+    new PerformanceObserver((list) => {
+      const entries = list.getEntries();
+      if (entries.length) lcp = entries[entries.length - 1].startTime;
+    }).observe({ type: "largest-contentful-paint", buffered: true });
+  } catch (e) {}
+  setTimeout(() => {
+    const nav = performance.getEntriesByType("navigation")[0];
+    const hard = !!nav && nav.name === location.href;
+    const paint = {};
+    for (const p of performance.getEntriesByType("paint")) paint[p.name] = p.startTime;
+    resolve({
+      url: location.href,
+      document_url: nav ? nav.name : null,
+      soft_navigation: !hard,
+      ttfb: hard ? nav.responseStart - nav.startTime : null,
+      dom_content_loaded: hard ? nav.domContentLoadedEventEnd - nav.startTime : null,
+      load_event_end: hard && nav.loadEventEnd ? nav.loadEventEnd - nav.startTime : null,
+      first_paint: hard ? paint["first-paint"] ?? null : null,
+      first_contentful_paint: hard ? paint["first-contentful-paint"] ?? null : null,
+      largest_contentful_paint: hard ? lcp : null,
+    });
+  }, 100);
+})
+"""
+
+logger = logging.getLogger("perf")
+
+
+def load_budgets(path: str | Path) -> dict[str, dict[str, float]]:
+    p = Path(path)
+    if not p.is_file():
+        return {}
+    data = json.loads(p.read_text(encoding="utf-8"))
+    if not isinstance(data, dict):
+        raise ValueError(f"Performance budgets in '{p}' must be a JSON object")
+    return data
+
+
+def budget_for_url(url: str, budgets: dict[str, dict[str, float]]) -> dict[str, float]:
+    # Every matching pattern applies; later (more specific) entries override earlier ones.
+    merged: dict[str, float] = {}
+    for pattern, limits in budgets.items():
+        if fnmatch(url, pattern):
+            merged.update(limits)
+    return merged
+
+
+def budget_violations(metrics: dict, budget: dict[str, float]) -> list[str]:
+    violations = []
+    for name, limit in budget.items():
+        value = metrics.get(name)
+        if value is not None and value > limit:
+            violations.append(f"{name}={value:.0f} exceeds budget {limit:.0f}")
+    return violations
+
+
+class PerfRecorder:
+
+    def __init__(self, budgets: dict[str, dict[str, float]], json_path: Path | None):
+        self.budgets = budgets
+        self.json_path = json_path
+        self.run_id = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        self.records: list[dict] = []
+
+    def probe(self, nodeid: str) -> "PerfProbe":
+        return PerfProbe(self, nodeid)
+
+    def for_test(self, nodeid: str) -> list[dict]:
+        return [r for r in self.records if r["test"] == nodeid]
+
+    def write_json(self, worker: str | None = None):
+        if not self.json_path or not self.records:
+            return
+        self.json_path.parent.mkdir(parents=True, exist_ok=True)
+        # One JSON object per line, appended, so runs can be trended over time.
+        with open(self.json_path, "a", encoding="utf-8") as f:
+            for record in self.records:
+                f.write(json.dumps({"run": self.run_id, "worker": worker, **record}) + "\n")
+
+
+def request_bytes(req) -> int:
+    try:
+        sizes = req.sizes()
+        return sizes["responseBodySize"] + sizes["responseHeadersSize"]
+    except Exception:
+        return 0
+
+
+def budget_failures(records: list[dict]) -> list[str]:
+    return [f'"{r["metrics"]["url"]}": ' + "; ".join(r["violations"]) for r in records if r["violations"]]
+
+
+class PerfProbe:
+
+    def __init__(self, recorder: PerfRecorder, nodeid: str):
+        self.recorder = recorder
+        self.nodeid = nodeid
+        # Requests seen per page since its previous capture. Counted from Playwright events,
+        # because the resource timing buffer stops at 250 entries and reports 0 bytes for
+        # cross-origin responses without Timing-Allow-Origin.
+        self.requests: dict = {}
+
+    def watch(self, page):
+        if page in self.requests:
+            return
+        seen = self.requests[page] = []
+        page.on("requestfinished", seen.append)
+        page.on("requestfailed", seen.append)
+
+    def discard(self, page):
+        # Called before a full page load, so late requests of the previous page are not charged to it.
+        self.requests.get(page, []).clear()
+
+    def drain(self, page) -> tuple[int, int]:
+        seen = self.requests.get(page, [])
+        done = list(seen)
+        seen.clear()
+        # Sizes are fetched here rather than in the event handler, outside Playwright's dispatch.
+        return len(done), sum(request_bytes(req) for req in done)
+
+    def capture(self, page, label: str) -> dict:
+        metrics = page.evaluate(PERF_METRICS_JS)
+        metrics["request_count"], metrics["transfer_bytes"] = self.drain(page)
+        # Budgets describe full page loads; a client-side route change is recorded but not checked.
+        budget = {} if metrics["soft_navigation"] else budget_for_url(metrics["url"], self.recorder.budgets)
+        violations = budget_violations(metrics, budget)
+        self.recorder.records.append(
+            {"test": self.nodeid, "label": label, "metrics": metrics, "budget": budget, "violations": violations}
+        )
+        logger.debug('Performance metrics for "%s": %s', label, metrics)
+        # Not asserted here: the test keeps running and fails at report time (see makereport below).
+        return metrics
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("perf", "navigation performance metrics")
+    group.addoption("--perf", action="store_true", default=False, help="Collect navigation performance metrics in e2e tests.")
+    group.addoption("--perf-budgets", default=str(DEFAULT_BUDGETS_FILE), help="JSON file with per-URL performance budgets.")
+    group.addoption("--perf-json", default=str(DEFAULT_PERF_JSON), help="JSON Lines file the collected metrics are appended to.")
+
+
+def pytest_configure(config):
+    if not config.getoption("--perf"):
+        return
+    config._perf_recorder = PerfRecorder(
+        load_budgets(config.getoption("--perf-budgets")),
+        Path(config.getoption("--perf-json")),
+    )
+
+
+def pytest_sessionfinish(session):
+    recorder = getattr(session.config, "_perf_recorder", None)
+    if recorder is not None:
+        worker = getattr(session.config, "workerinput", {}).get("workerid")
+        recorder.write_json(worker)
+
+
+@pytest.fixture
+def perf(request):
+    recorder = getattr(request.config, "_perf_recorder", None)
+    if recorder is None:
+        return None
+    return recorder.probe(request.node.nodeid)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    recorder = getattr(item.config, "_perf_recorder", None)
+    if recorder is None or report.when != "call":
+        return
+    records = recorder.for_test(item.nodeid)
+    failures = budget_failures(records)
+    if failures:
+        message = "Performance budget exceeded for " + "\nPerformance budget exceeded for ".join(failures)
+        if report.passed:
+            report.outcome = "failed"
+            report.longrepr = message
+        else:
+            # Keep the functional failure as the main error and report the budgets next to it.
+            report.sections.append(("Performance budget", message))
+    pytest_html = item.config.pluginmanager.getplugin("html")
+    if pytest_html is not None and records:
+        extras = getattr(report, "extras", [])
+        extras.append(pytest_html.extras.json(records, name="Performance metrics"))
+        report.extras = extras
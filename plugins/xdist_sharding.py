@@ -0,0 +1,211 @@
+from pathlib import Path
+import json
+import logging
+import os
+import socket
+
+import pytest
+
+try:
+    from xdist.scheduler import LoadScheduling
+except ImportError:  # pytest-xdist is optional, the plugin then only records durations
+    LoadScheduling = None
+
+DEFAULT_HISTORY_FILE = Path(__file__).resolve().parents[1] / ".cache" / "test-durations.json"
+# Weight of the newest run when smoothing recorded durations.
+HISTORY_ALPHA = 0.5
+# Duration assumed for tests that have no history yet and nothing to average over.
+DEFAULT_DURATION_S = 1.0
+# Items kept queued per worker: the one running plus the next one pytest needs as `nextitem`.
+WORKER_PREFETCH = 2
+SHARED_BROWSER_KEY = "shared_browser_endpoint"
+
+logger = logging.getLogger("xdist_sharding")
+
+
+def load_history(path: str | Path) -> dict[str, float]:
+    try:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+    return {k: float(v) for k, v in data.items()} if isinstance(data, dict) else {}
+
+
+def merge_history(history: dict[str, float], durations: dict[str, float], alpha: float = HISTORY_ALPHA) -> dict[str, float]:
+    merged = dict(history)
+    for nodeid, duration in durations.items():
+        old = merged.get(nodeid)
+        merged[nodeid] = duration if old is None else alpha * duration + (1 - alpha) * old
+    return merged
+
+
+def save_history(path: str | Path, history: dict[str, float]):
+    p = Path(path)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    tmp = p.with_name(f"{p.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(history, indent=2, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, p)
+
+
+def estimate(collection: list[str], history: dict[str, float]) -> list[float]:
+    known = [history[nodeid] for nodeid in collection if nodeid in history]
+    fallback = sum(known) / len(known) if known else DEFAULT_DURATION_S
+    return [history.get(nodeid, fallback) for nodeid in collection]
+
+
+def lpt_order(collection: list[str], history: dict[str, float]) -> list[int]:
+    # Longest-processing-time-first; ties keep collection order.
+    durations = estimate(collection, history)
+    return sorted(range(len(collection)), key=lambda i: -durations[i])
+
+
+if LoadScheduling is not None:
+
+    class DurationScheduling(LoadScheduling):
+        # Hands out the longest known tests first and refills each worker one item at a time,
+        # which is greedy LPT list scheduling: workers end up finishing at about the same time.
+
+        def __init__(self, config, log=None, history: dict[str, float] | None = None):
+            super().__init__(config, log)
+            self.history = history or {}
+
+        def check_schedule(self, node, duration: float = 0) -> None:
+            if node.shutting_down:
+                return
+            if self.pending:
+                missing = WORKER_PREFETCH - len(self.node2pending[node])
+                if missing > 0:
+                    self._send_tests(node, missing)
+            else:
+                node.shutdown()
+
+        def schedule(self) -> None:
+            assert self.collection_is_completed
+            if self.collection is not None:
+                for node in self.nodes:
+                    self.check_schedule(node)
+                return
+            if not self._check_nodes_have_same_collection():
+                self.log("**Different tests collected, aborting run**")
+                return
+            self.collection = next(iter(self.node2collection.values()))
+            self.pending[:] = lpt_order(self.collection, self.history)
+            if not self.collection:
+                return
+            for node in self.nodes:
+                self.check_schedule(node)
+
+
+def is_xdist_worker(config) -> bool:
+    return hasattr(config, "workerinput")
+
+
+def xdist_enabled(config) -> bool:
+    return bool(getattr(config.option, "numprocesses", None)) and config.getoption("dist", "no") != "no"
+
+
+def free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class SharedBrowser:
+    # One Chromium launched by the xdist controller; workers attach to it over CDP and
+    # only create their own (isolated) contexts instead of launching a browser each.
+
+    def __init__(self, headless: bool = True):
+        self.headless = headless
+        self.playwright = None
+        self.browser = None
+        self.endpoint: str | None = None
+
+    def start(self) -> str:
+        from playwright.sync_api import sync_playwright
+
+        port = free_port()
+        self.playwright = sync_playwright().start()
+        self.browser = self.playwright.chromium.launch(
+            headless=self.headless, args=[f"--remote-debugging-port={port}"]
+        )
+        self.endpoint = f"http://127.0.0.1:{port}"
+        logger.debug('Shared browser listening on "%s"', self.endpoint)
+        return self.endpoint
+
+    def stop(self):
+        if self.browser is not None:
+            self.browser.close()
+        if self.playwright is not None:
+            self.playwright.stop()
+
+
+class DurationRecorder:
+    # Registered on the controller only; with xdist it also receives every report sent back by the workers.
+
+    def __init__(self, history_path: str | Path):
+        self.history_path = history_path
+        self.durations: dict[str, float] = {}
+
+    def pytest_runtest_logreport(self, report):
+        self.durations[report.nodeid] = self.durations.get(report.nodeid, 0.0) + report.duration
+
+    def pytest_sessionfinish(self):
+        if self.durations:
+            save_history(self.history_path, merge_history(load_history(self.history_path), self.durations))
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("xdist_sharding", "duration-aware xdist scheduling")
+    group.addoption("--duration-history", default=str(DEFAULT_HISTORY_FILE), help="JSON file with recorded per-test durations.")
+    group.addoption("--no-duration-sched", action="store_true", default=False, help="Use the default xdist load scheduling.")
+    group.addoption(
+        "--shared-browser",
+        action="store_true",
+        default=False,
+        help="Launch one Chromium in the xdist controller and let workers connect to it over CDP.",
+    )
+
+
+def pytest_configure(config):
+    if is_xdist_worker(config):
+        return
+    config.pluginmanager.register(DurationRecorder(config.getoption("--duration-history")), "duration_recorder")
+    if not xdist_enabled(config) or not config.getoption("--shared-browser"):
+        return
+    browsers = config.getoption("--browser", None) or ["chromium"]
+    if browsers != ["chromium"]:
+        raise pytest.UsageError("--shared-browser only supports --browser chromium")
+    config._shared_browser = SharedBrowser(headless=not config.getoption("--headed", False))
+    config._shared_browser.start()
+
+
+def pytest_unconfigure(config):
+    shared = getattr(config, "_shared_browser", None)
+    if shared is not None:
+        shared.stop()
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    shared = getattr(node.config, "_shared_browser", None)
+    if shared is not None:
+        node.workerinput[SHARED_BROWSER_KEY] = shared.endpoint
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_xdist_make_scheduler(config, log):
+    if LoadScheduling is None or config.getoption("--no-duration-sched") or config.getoption("dist") != "load":
+        return None
+    return DurationScheduling(config, log, history=load_history(config.getoption("--duration-history")))
+
+
+@pytest.fixture(scope="session")
+def browser(pytestconfig, launch_browser, playwright):
+    endpoint = getattr(pytestconfig, "workerinput", {}).get(SHARED_BROWSER_KEY)
+    if endpoint:
+        browser = playwright.chromium.connect_over_cdp(endpoint)
+    else:
+        browser = launch_browser()
+    yield browser
+    # For a CDP connection this only closes our contexts and disconnects.
+    browser.close()
@@ -0,0 +1,99 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+import hashlib
+import re
+import threading
+import pytest
+
+
+class LocalHandler(BaseHTTPRequestHandler):
+
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        self.respond(head_only=True)
+
+    def do_GET(self):
+        self.respond()
+
+    def respond(self, head_only: bool = False):
+        local = self.server.local
+        path = urlparse(self.path).path
+        local.log.append((self.command, path, dict(self.headers)))
+        if path in local.redirects:
+            return self.reply(302, {"Location": local.redirects[path]}, b"")
+        body = local.files.get(path)
+        if body is None:
+            return self.reply(404, {}, b"")
+
+        headers = {"Accept-Ranges": "bytes"} if local.ranges else {}
+        etag = local.etag(path)
+        if local.etags:
+            headers["ETag"] = etag
+            if self.headers.get("If-None-Match") == etag:
+                return self.reply(304, headers, b"")
+
+        m = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range") or "")
+        if_range = self.headers.get("If-Range")
+        # A stale If-Range validator means "send the whole (new) file".
+        if m and local.ranges and (if_range is None or if_range == etag):
+            start = int(m.group(1))
+            if start >= len(body):
+                return self.reply(416, {"Content-Range": f"bytes */{len(body)}"}, b"")
+            end = min(int(m.group(2)), len(body) - 1) if m.group(2) else len(body) - 1
+            headers["Content-Range"] = f"bytes {start}-{end}/{len(body)}"
+            return self.reply(206, headers, body[start : end + 1], head_only)
+        return self.reply(200, headers, body, head_only)
+
+    def reply(self, status: int, headers: dict, body: bytes, head_only: bool = False):
+        local = self.server.local
+        local.statuses.append(status)
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if head_only or not body:
+            return
+        if local.drops > 0 and len(body) > 1:
+            # Cut the body off halfway to simulate a dropped connection.
+            local.drops -= 1
+            self.wfile.write(body[: len(body) // 2])
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+
+class LocalServer:
+    # In-process HTTP server for unit tests: serves `files` by path, with ETag / 304,
+    # Range / If-Range / 206, `redirects` (302) and a number of dropped responses.
+
+    def __init__(self):
+        self.files: dict[str, bytes] = {}
+        self.redirects: dict[str, str] = {}
+        self.etags = True
+        self.ranges = True
+        self.drops = 0
+        self.log: list[tuple[str, str, dict]] = []
+        self.statuses: list[int] = []
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), LocalHandler)
+        self.httpd.local = self
+
+    def url(self, path: str) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}{path}"
+
+    def etag(self, path: str) -> str:
+        return f'"{hashlib.sha256(self.files[path]).hexdigest()[:16]}"'
+
+    def range_requests(self) -> list[str]:
+        return [headers["Range"] for method, _path, headers in self.log if method == "GET" and "Range" in headers]
+
+
+@pytest.fixture
+def local_server():
+    server = LocalServer()
+    threading.Thread(target=server.httpd.serve_forever, daemon=True).start()
+    yield server
+    server.httpd.shutdown()
+    server.httpd.server_close()
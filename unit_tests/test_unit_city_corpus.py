@@ -0,0 +1,68 @@
+import os
+import pytest
+from api.city_corpus import CityCorpus, parse_summary, parse_temperature
+
+BERLIN = "Berlin is the capital of Germany.\nIt is big.\nThe current temperature in Berlin is 22.51 degrees Celsius.\n"
+
+
+def write_city(root, name: str, text: str, mtime_ns: int | None = None):
+    p = root / f"{name}.txt"
+    p.write_text(text, encoding="utf-8")
+    if mtime_ns is not None:
+        os.utime(p, ns=(mtime_ns, mtime_ns))
+    return p
+
+
+@pytest.fixture
+def corpus_dir(tmp_path):
+    root = tmp_path / "mocked_city_files"
+    root.mkdir()
+    write_city(root, "Berlin", BERLIN)
+    write_city(root, "Dublin", "Dublin is in Ireland.\nThe current temperature in Dublin is -1.5 degrees Celsius.\n")
+    (root / "notes.md").write_text("ignored", encoding="utf-8")
+    return root
+
+
+def test_parse_summary_and_temperature():
+    assert parse_summary(BERLIN) == "Berlin is the capital of Germany.\nIt is big."
+    assert parse_temperature(BERLIN) == 22.51
+    assert parse_temperature("no temperature here") is None
+
+
+def test_cases_are_sorted_and_parsed(corpus_dir, tmp_path):
+    corpus = CityCorpus(corpus_dir, tmp_path / "snapshot.json")
+    assert corpus.cities() == ["Berlin", "Dublin"]
+    assert corpus.cases_with_temperature()[1] == ("Dublin", "Dublin is in Ireland.", -1.5)
+
+
+def test_parsing_is_lazy(corpus_dir, tmp_path):
+    corpus = CityCorpus(corpus_dir, tmp_path / "snapshot.json")
+    assert corpus.cities() == ["Berlin", "Dublin"]
+    assert not any(e.parsed for e in corpus.entries())
+
+
+def test_snapshot_is_reused_and_invalidated_by_mtime(corpus_dir, tmp_path):
+    snapshot = tmp_path / "snapshot.json"
+    CityCorpus(corpus_dir, snapshot).cases()
+    assert snapshot.exists()
+
+    reloaded = CityCorpus(corpus_dir, snapshot)
+    assert all(e.parsed for e in reloaded.entries())
+
+    berlin = corpus_dir / "Berlin.txt"
+    new_mtime = berlin.stat().st_mtime_ns + 1_000_000_000
+    write_city(corpus_dir, "Berlin", BERLIN.replace("big", "huge"), mtime_ns=new_mtime)
+    changed = CityCorpus(corpus_dir, snapshot)
+    entries = {e.city: e for e in changed.entries()}
+    assert not entries["Berlin"].parsed
+    assert entries["Dublin"].parsed
+    assert "huge" in entries["Berlin"].summary
+
+
+def test_deleted_files_drop_out_of_snapshot(corpus_dir, tmp_path):
+    snapshot = tmp_path / "snapshot.json"
+    CityCorpus(corpus_dir, snapshot).cases()
+    (corpus_dir / "Dublin.txt").unlink()
+    corpus = CityCorpus(corpus_dir, snapshot)
+    assert corpus.cases() == [("Berlin", "Berlin is the capital of Germany.\nIt is big.")]
+    assert "Dublin.txt" not in CityCorpus(corpus_dir, snapshot).load_snapshot()
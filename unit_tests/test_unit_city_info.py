@@ -1,46 +1,15 @@
-import re
 from pathlib import Path
 import pytest
 import api.city_info as city_info
+from api.city_corpus import mocked_city_corpus
 
-_MOCKED_DIR = Path(__file__).resolve().parents[1] / "files" / "mocked_city_files"
-
-def discover_mocked_city_files() -> list[Path]:
-    return sorted(p for p in _MOCKED_DIR.glob("*.txt") if p.is_file())
-
-
-def city_from_mock_file(path: Path) -> str:
-    return path.stem.strip()
-
-
-def parse_summary_from_mock_file(text: str) -> str:
-    lines = [ln.rstrip() for ln in text.splitlines()]
-    while lines and not lines[-1].strip():
-        lines.pop()
-    if lines and lines[-1].lower().startswith("the current temperature in "):
-        lines = lines[:-1]
-    return "\n".join(lines).strip()
-
-
-def parse_temperature_from_mock_file(text: str) -> float | None:
-    m = re.search(r"The current temperature in .*? is\s+(-?\d+(?:\.\d+)?)\s+degrees Celsius\.", text)
-    if not m:
-        return None
-    return float(m.group(1))
 
 def mocked_cities() -> list[tuple[str, str, float | None]]:
-    cases: list[tuple[str, str, float | None]] = []
-    for p in discover_mocked_city_files():
-        raw = p.read_text(encoding="utf-8")
-        city = city_from_mock_file(p)
-        summary = parse_summary_from_mock_file(raw)
-        temp = parse_temperature_from_mock_file(raw)
-        cases.append((city, summary, temp))
-    return cases
+    return mocked_city_corpus().cases_with_temperature()
 
 
 def mocked_city_ids() -> list[str]:
-    return [city for city, _summary, _temp in mocked_cities()]
+    return mocked_city_corpus().cities()
 
 
 @pytest.mark.parametrize(
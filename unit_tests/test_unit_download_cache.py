@@ -0,0 +1,133 @@
+import hashlib
+import multiprocessing
+import pytest
+from e2e_tests.download_cache import DownloadCache
+
+
+BODY_V1 = b"%PDF-1.7 datasheet v1"
+
+
+@pytest.fixture
+def server(local_server):
+    local_server.files["/datasheet.pdf"] = BODY_V1
+    return local_server
+
+
+def cached_download(cache, server, path, out):
+    # Same flow as ReversingLabsPage.download_file_by_selector_and_text: revalidate, and on a
+    # miss download the file (here straight from the server files, standing in for the browser) and put() it.
+    url = server.url(path)
+    result, validators = cache.revalidate(url, out)
+    if result is not None:
+        return result
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_bytes(server.files[path])
+    return cache.put(url, out, **validators)
+
+
+def test_second_download_is_served_from_cache(server, tmp_path):
+    cache = DownloadCache(tmp_path / "cache")
+
+    first = cached_download(cache, server, "/datasheet.pdf", tmp_path / "run1" / "datasheet.pdf")
+    second = cached_download(cache, server, "/datasheet.pdf", tmp_path / "run2" / "datasheet.pdf")
+
+    assert not first.from_cache
+    assert second.from_cache
+    assert server.statuses == [200, 304]
+    assert second.path.read_bytes() == BODY_V1
+    assert second.sha256 == hashlib.sha256(BODY_V1).hexdigest()
+
+
+def test_changed_file_is_downloaded_again(server, tmp_path):
+    cache = DownloadCache(tmp_path / "cache")
+    out = tmp_path / "datasheet.pdf"
+
+    cached_download(cache, server, "/datasheet.pdf", out)
+    server.files["/datasheet.pdf"] = b"%PDF-1.7 datasheet v2"
+    result = cached_download(cache, server, "/datasheet.pdf", out)
+
+    assert not result.from_cache
+    assert out.read_bytes() == b"%PDF-1.7 datasheet v2"
+
+
+def test_corrupted_blob_is_not_served(server, tmp_path):
+    cache = DownloadCache(tmp_path / "cache")
+    first = cached_download(cache, server, "/datasheet.pdf", tmp_path / "run1" / "datasheet.pdf")
+    cache.blob_path(first.sha256).write_bytes(b"tampered")
+
+    result = cached_download(cache, server, "/datasheet.pdf", tmp_path / "run2" / "datasheet.pdf")
+
+    assert not result.from_cache
+    assert server.statuses == [200, 200]
+    assert result.path.read_bytes() == BODY_V1
+
+
+def test_eviction_keeps_cache_within_max_bytes(server, tmp_path):
+    server.files["/a.pdf"] = BODY_V1
+    server.files["/b.pdf"] = b"%PDF-1.7 other datasheet"
+    cache = DownloadCache(tmp_path / "cache", max_bytes=len(BODY_V1))
+
+    cached_download(cache, server, "/a.pdf", tmp_path / "a.pdf")
+    cached_download(cache, server, "/b.pdf", tmp_path / "b.pdf")
+
+    index = cache.load_index()
+    assert list(index) == [server.url("/b.pdf")]
+    assert len(list(cache.blobs.iterdir())) == 1
+
+
+def test_new_versions_of_one_url_do_not_leave_old_blobs(server, tmp_path):
+    cache = DownloadCache(tmp_path / "cache", max_bytes=1000)
+    for i in range(5):
+        server.files["/datasheet.pdf"] = f"%PDF-1.7 datasheet v{i}".encode() * 30
+        cached_download(cache, server, "/datasheet.pdf", tmp_path / "datasheet.pdf")
+
+    entry = cache.load_index()[server.url("/datasheet.pdf")]
+    assert [blob.name for blob in cache.blobs.iterdir()] == [entry["sha256"]]
+
+
+def test_revalidate_miss_then_put_then_hit(server, tmp_path):
+    cache = DownloadCache(tmp_path / "cache")
+    url = server.url("/datasheet.pdf")
+
+    result, validators = cache.revalidate(url, tmp_path / "datasheet.pdf")
+    assert result is None
+    assert validators["etag"] == server.etag("/datasheet.pdf")
+
+    # The caller downloads the file itself (e.g. through the browser) and stores it.
+    downloaded = tmp_path / "browser" / "datasheet.pdf"
+    downloaded.parent.mkdir()
+    downloaded.write_bytes(BODY_V1)
+    stored = cache.put(url, downloaded, **validators)
+    assert not stored.from_cache
+    assert stored.sha256 == hashlib.sha256(BODY_V1).hexdigest()
+
+    hit, _validators = cache.revalidate(url, tmp_path / "again" / "datasheet.pdf")
+    assert hit.from_cache
+    assert hit.sha256 == stored.sha256
+    assert hit.path.read_bytes() == BODY_V1
+    assert server.statuses == [200, 304]
+
+
+def download_in_child(root, server, path, out):
+    cached_download(DownloadCache(root), server, path, out)
+
+
+def test_concurrent_processes_keep_every_index_entry(server, tmp_path):
+    paths = [f"/f{i}.pdf" for i in range(8)]
+    for i, path in enumerate(paths):
+        server.files[path] = f"datasheet {i}".encode()
+    ctx = multiprocessing.get_context("fork")
+    procs = [
+        ctx.Process(target=download_in_child, args=(tmp_path / "cache", server, path, tmp_path / f"out{i}" / "f.pdf"))
+        for i, path in enumerate(paths)
+    ]
+    for proc in procs:
+        proc.start()
+    for proc in procs:
+        proc.join(30)
+
+    assert [proc.exitcode for proc in procs] == [0] * len(procs)
+    cache = DownloadCache(tmp_path / "cache")
+    index = cache.load_index()
+    assert set(index) == {server.url(path) for path in paths}
+    assert {blob.name for blob in cache.blobs.iterdir()} == {e["sha256"] for e in index.values()}
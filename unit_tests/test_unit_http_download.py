@@ -0,0 +1,99 @@
+import hashlib
+import os
+import pytest
+from e2e_tests import http_download
+
+PAYLOAD = os.urandom(300_000)
+PAYLOAD_SHA256 = hashlib.sha256(PAYLOAD).hexdigest()
+
+
+@pytest.fixture
+def server_url(local_server):
+    local_server.files["/datasheet.pdf"] = PAYLOAD
+    return local_server.url("/datasheet.pdf")
+
+
+def test_download_streams_to_target_and_hashes(server_url, tmp_path):
+    out = tmp_path / "datasheet.pdf"
+    result = http_download.download(server_url, out, expected_sha256=PAYLOAD_SHA256)
+    assert out.read_bytes() == PAYLOAD
+    assert result.sha256 == PAYLOAD_SHA256
+    assert result.size == len(PAYLOAD)
+    assert not http_download.part_path(out).exists()
+
+
+def test_download_resumes_existing_part_file(local_server, server_url, tmp_path):
+    out = tmp_path / "datasheet.pdf"
+    part = http_download.part_path(out)
+    part.write_bytes(PAYLOAD[:1000])
+    http_download.save_validator(part, local_server.etag("/datasheet.pdf"))
+    result = http_download.download(server_url, out)
+    assert result.resumed
+    assert local_server.range_requests() == ["bytes=1000-"]
+    assert out.read_bytes() == PAYLOAD
+    assert result.sha256 == PAYLOAD_SHA256
+    assert not http_download.validator_path(part).exists()
+
+
+def test_download_restarts_when_part_file_is_from_an_older_version(local_server, server_url, tmp_path):
+    out = tmp_path / "datasheet.pdf"
+    part = http_download.part_path(out)
+    old_version = b"A" * 1000
+    part.write_bytes(old_version)
+    local_server.files["/old.pdf"] = old_version
+    http_download.save_validator(part, local_server.etag("/old.pdf"))
+
+    result = http_download.download(server_url, out)
+
+    assert not result.resumed
+    assert local_server.statuses == [200]
+    assert out.read_bytes() == PAYLOAD
+    assert result.sha256 == PAYLOAD_SHA256
+
+
+def test_download_discards_part_file_without_validator(local_server, server_url, tmp_path):
+    out = tmp_path / "datasheet.pdf"
+    http_download.part_path(out).write_bytes(b"A" * 1000)
+
+    result = http_download.download(server_url, out)
+
+    assert not result.resumed
+    assert local_server.range_requests() == []
+    assert out.read_bytes() == PAYLOAD
+
+
+def test_download_resumes_after_dropped_connection(local_server, server_url, tmp_path):
+    local_server.drops = 1
+    out = tmp_path / "datasheet.pdf"
+    result = http_download.download(server_url, out, retries=2, chunk_size=16 * 1024)
+    assert result.resumed
+    assert out.read_bytes() == PAYLOAD
+
+
+def test_download_parallel_segments(local_server, server_url, tmp_path):
+    out = tmp_path / "datasheet.pdf"
+    result = http_download.download(server_url, out, segments=4, parallel_threshold=1)
+    assert result.segments == 4
+    assert len(local_server.range_requests()) == 4
+    assert out.read_bytes() == PAYLOAD
+    assert result.sha256 == PAYLOAD_SHA256
+
+
+def test_download_hash_mismatch_leaves_no_file(server_url, tmp_path):
+    out = tmp_path / "datasheet.pdf"
+    with pytest.raises(RuntimeError, match="SHA-256 mismatch"):
+        http_download.download(server_url, out, expected_sha256="0" * 64)
+    assert not out.exists()
+    assert not http_download.part_path(out).exists()
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("bytes 100-199/1234", 1234),
+        ("bytes */1234", 1234),
+        (None, None),
+    ],
+)
+def test_total_from_content_range(value, expected):
+    assert http_download.total_from_content_range(value) == expected
@@ -0,0 +1,104 @@
+import pytest
+import requests
+from plugins.netprof import NetworkCall, NetworkProfiler, summarize
+
+BODY = b"x" * 4096
+
+
+@pytest.fixture
+def server_url(local_server):
+    local_server.files["/file"] = BODY
+    return local_server.url("/file")
+
+
+@pytest.fixture
+def profiler():
+    profiler = NetworkProfiler()
+    profiler.patch_requests()
+    profiler.current = "test_node"
+    yield profiler
+    profiler.unpatch_requests()
+
+
+def test_summarize_groups_by_source_and_host():
+    rows = summarize(
+        [
+            NetworkCall("requests", "https://en.wikipedia.org/a", 100, 0.5),
+            NetworkCall("requests", "https://en.wikipedia.org/b", 50, 0.25),
+            NetworkCall("playwright", "https://www.reversinglabs.com/", 1000, 1.0),
+        ]
+    )
+    assert [(r["source"], r["host"], r["count"]) for r in rows] == [
+        ("playwright", "www.reversinglabs.com", 1),
+        ("requests", "en.wikipedia.org", 2),
+    ]
+    assert rows[1]["bytes"] == 150
+    assert rows[1]["latency_s"] == pytest.approx(0.75)
+    assert rows[1]["max_latency_s"] == pytest.approx(0.5)
+
+
+def test_requests_calls_are_attributed_to_current_test(profiler, server_url):
+    requests.get(server_url, timeout=5)
+    with requests.get(server_url, timeout=5, stream=True) as resp:
+        for _chunk in resp.iter_content(1024):
+            pass
+
+    calls = profiler.pop("test_node")
+    assert [c.host for c in calls] == ["127.0.0.1", "127.0.0.1"]
+    assert [c.bytes for c in calls] == [len(BODY), len(BODY)]
+    assert all(c.latency_s > 0 for c in calls)
+
+
+def test_redirected_call_is_counted_once(profiler, local_server, server_url):
+    local_server.redirects["/moved"] = server_url
+    resp = requests.get(local_server.url("/moved"), timeout=5)
+
+    assert resp.status_code == 200
+    assert local_server.statuses == [302, 200]
+    calls = profiler.pop("test_node")
+    assert len(calls) == 1
+    assert calls[0].bytes == len(BODY)
+
+
+def test_calls_outside_a_test_are_ignored(profiler, server_url):
+    profiler.current = None
+    requests.get(server_url, timeout=5)
+    assert profiler.calls == {}
+
+
+def test_unpatch_restores_requests(server_url):
+    original = requests.Session.send
+    profiler = NetworkProfiler()
+    profiler.patch_requests()
+    profiler.unpatch_requests()
+    assert requests.Session.send is original
+
+
+class FakeRequest:
+
+    def __init__(self, url: str):
+        self.url = url
+        self.timing = {"responseEnd": 250.0}
+        self.size_calls = 0
+
+    def sizes(self):
+        self.size_calls += 1
+        return {"responseBodySize": 900, "responseHeadersSize": 100}
+
+
+def test_playwright_sizes_are_read_after_the_test():
+    profiler = NetworkProfiler()
+    profiler.current = "test_node"
+    finished, failed = FakeRequest("https://www.reversinglabs.com/"), FakeRequest("https://cdn.example.com/x.js")
+    profiler.on_request_finished(finished)
+    profiler.on_request_failed(failed)
+    assert finished.size_calls == 0
+
+    profiler.collect_playwright()
+
+    calls = profiler.pop("test_node")
+    assert [(c.host, c.bytes, c.latency_s) for c in calls] == [
+        ("www.reversinglabs.com", 1000, 0.25),
+        ("cdn.example.com", 0, 0.0),
+    ]
+    assert (finished.size_calls, failed.size_calls) == (1, 0)
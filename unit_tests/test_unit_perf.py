@@ -0,0 +1,132 @@
+import json
+import pytest
+from plugins.perf import PerfRecorder, budget_failures, budget_for_url, budget_violations, load_budgets
+
+
+BUDGETS = {
+    "https://www.reversinglabs.com/*": {"largest_contentful_paint": 4000, "request_count": 100},
+    "https://www.reversinglabs.com/products/*": {"largest_contentful_paint": 6000},
+}
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("https://www.reversinglabs.com/", {"largest_contentful_paint": 4000, "request_count": 100}),
+        ("https://www.reversinglabs.com/products/spectra-analyze", {"largest_contentful_paint": 6000, "request_count": 100}),
+        ("https://example.com/", {}),
+    ],
+)
+def test_budget_for_url_merges_matching_patterns(url, expected):
+    assert budget_for_url(url, BUDGETS) == expected
+
+
+def test_budget_violations_reports_only_exceeded_metrics():
+    metrics = {"largest_contentful_paint": 4500.0, "request_count": 80, "first_paint": None}
+    budget = {"largest_contentful_paint": 4000, "request_count": 100, "first_paint": 1000}
+    violations = budget_violations(metrics, budget)
+    assert len(violations) == 1
+    assert violations[0].startswith("largest_contentful_paint=4500")
+
+
+def test_load_budgets_missing_file_returns_empty(tmp_path):
+    assert load_budgets(tmp_path / "missing.json") == {}
+
+
+def test_load_budgets_rejects_non_object(tmp_path):
+    path = tmp_path / "budgets.json"
+    path.write_text(json.dumps([1, 2]), encoding="utf-8")
+    with pytest.raises(ValueError):
+        load_budgets(path)
+
+
+class FakeRequest:
+
+    def __init__(self, body: int):
+        self.body = body
+
+    def sizes(self):
+        return {"responseBodySize": self.body, "responseHeadersSize": 100}
+
+
+class FakePage:
+
+    def __init__(self, metrics: dict):
+        self.metrics = metrics
+        self.handlers: dict[str, list] = {}
+
+    def on(self, event, handler):
+        self.handlers.setdefault(event, []).append(handler)
+
+    def emit(self, event, req):
+        for handler in self.handlers.get(event, []):
+            handler(req)
+
+    def evaluate(self, _js):
+        return dict(self.metrics)
+
+
+def test_capture_counts_requests_since_previous_capture_and_does_not_raise():
+    recorder = PerfRecorder(BUDGETS, None)
+    probe = recorder.probe("test_x")
+    page = FakePage({"url": "https://www.reversinglabs.com/", "soft_navigation": False, "largest_contentful_paint": 5000})
+    probe.watch(page)
+    for _ in range(300):
+        page.emit("requestfinished", FakeRequest(900))
+    page.emit("requestfailed", FakeRequest(0))
+
+    metrics = probe.capture(page, "home")
+    assert metrics["request_count"] == 301
+    assert metrics["transfer_bytes"] == 300 * 1000 + 100
+    assert len(recorder.records[0]["violations"]) == 2
+
+    assert probe.capture(page, "again")["request_count"] == 0
+    assert len(budget_failures(recorder.for_test("test_x"))) == 2
+
+
+def test_capture_skips_budgets_for_soft_navigation():
+    recorder = PerfRecorder(BUDGETS, None)
+    probe = recorder.probe("test_x")
+    page = FakePage({"url": "https://www.reversinglabs.com/products/x", "soft_navigation": True, "largest_contentful_paint": None})
+    probe.watch(page)
+    for _ in range(200):
+        page.emit("requestfinished", FakeRequest(10))
+    probe.capture(page, "route change")
+    assert recorder.records[0]["budget"] == {}
+    assert budget_failures(recorder.records) == []
+
+
+def test_budget_violation_fails_test_after_it_ran(pytester):
+    pytester.makeconftest(
+        """
+        import pytest
+        from plugins.perf import PerfRecorder
+
+        pytest_plugins = ["plugins.perf"]
+
+        def pytest_configure(config):
+            config._perf_recorder = PerfRecorder({"*": {"request_count": 1}}, None)
+        """
+    )
+    pytester.makepyfile(
+        """
+        def test_nav(perf, request):
+            request.config._perf_recorder.records.append(
+                {"test": request.node.nodeid, "label": "a", "metrics": {"url": "u"}, "budget": {}, "violations": ["request_count=5 exceeds budget 1"]}
+            )
+        """
+    )
+    result = pytester.runpytest_inprocess("-p", "no:cacheprovider")
+    result.assert_outcomes(failed=1)
+    result.stdout.fnmatch_lines(['*Performance budget exceeded for "u": request_count=5 exceeds budget 1*'])
+
+
+def test_discard_drops_requests_of_the_previous_page():
+    recorder = PerfRecorder(BUDGETS, None)
+    probe = recorder.probe("test_x")
+    page = FakePage({"url": "https://www.reversinglabs.com/", "soft_navigation": False})
+    probe.watch(page)
+    page.emit("requestfinished", FakeRequest(500))
+    probe.discard(page)
+    page.emit("requestfinished", FakeRequest(900))
+    assert probe.capture(page, "next")["request_count"] == 1
@@ -0,0 +1,71 @@
+import pytest
+from plugins import xdist_sharding
+from plugins.xdist_sharding import estimate, load_history, lpt_order, merge_history, save_history
+
+
+class FakeConfig:
+    def __init__(self, workers: int):
+        self.workers = workers
+
+    def getvalue(self, name):
+        return [f"{self.workers}*popen"] if name == "tx" else None
+
+    def getoption(self, name, default=None):
+        return default
+
+
+class FakeNode:
+    def __init__(self, name: str):
+        self.name = name
+        self.gateway = type("Gateway", (), {"id": name})()
+        self.shutting_down = False
+
+    def send_runtest_some(self, indices):
+        pass
+
+    def shutdown(self):
+        self.shutting_down = True
+
+
+def simulate(collection: list[str], durations: dict[str, float], workers: int) -> dict[str, float]:
+    # Runs the scheduler against simulated workers and returns each worker's busy time.
+    sched = xdist_sharding.DurationScheduling(FakeConfig(workers), history=durations)
+    nodes = [FakeNode(f"gw{i}") for i in range(workers)]
+    for node in nodes:
+        sched.add_node(node)
+        sched.add_node_collection(node, collection)
+    sched.schedule()
+    clock = {node.name: 0.0 for node in nodes}
+    while sched.has_pending:
+        busy = [n for n in nodes if sched.node2pending.get(n)]
+        node = min(busy, key=lambda n: clock[n.name] + durations[collection[sched.node2pending[n][0]]])
+        index = sched.node2pending[node][0]
+        clock[node.name] += durations[collection[index]]
+        sched.mark_test_complete(node, index)
+    return clock
+
+
+def test_lpt_order_longest_first_and_unknown_tests_use_average():
+    collection = ["a", "b", "c", "d"]
+    history = {"a": 1.0, "b": 5.0, "c": 3.0}
+    assert estimate(collection, history)[3] == pytest.approx(3.0)
+    assert lpt_order(collection, history) == [1, 2, 3, 0]
+
+
+def test_lpt_order_without_history_keeps_collection_order():
+    assert lpt_order(["a", "b", "c"], {}) == [0, 1, 2]
+
+
+def test_merge_history_smooths_known_and_adds_new(tmp_path):
+    path = tmp_path / "durations.json"
+    save_history(path, {"a": 2.0})
+    merged = merge_history(load_history(path), {"a": 4.0, "b": 1.0})
+    assert merged == {"a": pytest.approx(3.0), "b": 1.0}
+
+
+def test_duration_scheduling_balances_workers():
+    durations = {"t1": 8.0, "t2": 7.0, "t3": 6.0, "t4": 5.0, "t5": 4.0, "t6": 3.0, "t7": 2.0, "t8": 1.0}
+    # Collection order puts all long tests together, which naive chunking would give to one worker.
+    clock = simulate(list(durations), durations, workers=2)
+    assert sum(clock.values()) == sum(durations.values())
+    assert max(clock.values()) - min(clock.values()) <= 2.0